@@ -0,0 +1,369 @@
+"""
+Shared helpers for the FlightAware end-to-end test scripts
+"""
+
+import asyncio
+import atexit
+import logging
+import queue
+import sys
+import threading
+import time
+import requests
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timedelta
+from operator import itemgetter
+import random
+import numpy as np
+from logging.handlers import QueueHandler, QueueListener
+
+# Configuration
+BASE_URL = "http://localhost:5000"
+API_BASE_URL = f"{BASE_URL}/api"
+
+# Shared keep-alive session so every request reuses pooled connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=50,
+    max_retries=Retry(total=3, backoff_factor=0.1)
+))
+SESSION.headers.update({"Connection": "keep-alive"})
+atexit.register(SESSION.close)
+
+# Output goes through a queue and is written to stdout by a listener thread, so
+# senders never block on terminal I/O
+log = logging.getLogger("flightsim")
+log.setLevel(logging.INFO)
+log.propagate = False
+_log_queue = queue.Queue(-1)
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+log.addHandler(QueueHandler(_log_queue))
+atexit.register(_log_listener.stop)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Fields printed for each active or completed flight, fetched in one C-level call per record
+active_fields = itemgetter("flight_id", "status", "latitude", "longitude")
+completed_fields = itemgetter("flight_id", "completed_at", "total_tracking_points")
+
+# Successful GET responses are reused for GET_CACHE_TTL seconds (the frontend's polling
+# cadence); any write clears the cache so reads never see data older than the last POST
+GET_CACHE_TTL = 2.0
+_get_cache = {}  # url -> (expires_at, response)
+_get_cache_lock = threading.Lock()
+
+def _cached_get(url):
+    """GET url, reusing a successful response fetched within the last GET_CACHE_TTL seconds"""
+    now = time.monotonic()
+    with _get_cache_lock:
+        entry = _get_cache.get(url)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    response = SESSION.get(url)
+    if response.status_code == 200:
+        with _get_cache_lock:
+            _get_cache[url] = (now + GET_CACHE_TTL, response)
+    return response
+
+def _clear_get_cache():
+    """Drop every cached GET response after a write"""
+    with _get_cache_lock:
+        _get_cache.clear()
+
+def post_json(url, obj, session=SESSION):
+    """POST obj as JSON, encoded with orjson rather than requests' json= encoder"""
+    response = session.post(url, data=orjson.dumps(obj), headers=_JSON_HEADERS)
+    _clear_get_cache()
+    return response
+
+def fail(response, label):
+    """Print a failed response's status and body without assuming it is JSON"""
+    log.info(f"❌ {label}: {response.status_code} {response.text[:500]}")
+
+# Value pools for generated test flights
+_STATUSES = ("en-route", "departed", "landed", "delayed")
+_AIRCRAFT = ("Boeing 737", "Airbus A320", "Boeing 777", "Airbus A350")
+_AIRLINES = ("American Airlines", "Delta", "United", "Southwest")
+_DEPARTURES = ("JFK", "LAX", "ORD", "DFW")
+_ARRIVALS = ("LAX", "JFK", "SFO", "MIA")
+
+def make_batch(n):
+    """Generate n realistic flight records, drawing each field for the whole batch at once"""
+    flight_numbers = random.choices(range(100, 1000), k=n)
+    lats = [round(random.uniform(25.0, 45.0), 6) for _ in range(n)]
+    lons = [round(random.uniform(-80.0, -70.0), 6) for _ in range(n)]
+    altitudes = random.choices(range(20000, 40001), k=n)
+    speeds = random.choices(range(300, 601), k=n)
+    headings = random.choices(range(0, 361), k=n)
+    statuses = random.choices(_STATUSES, k=n)
+    aircraft = random.choices(_AIRCRAFT, k=n)
+    airlines = random.choices(_AIRLINES, k=n)
+    departures = random.choices(_DEPARTURES, k=n)
+    arrivals = random.choices(_ARRIVALS, k=n)
+    timestamp = datetime.now().isoformat()
+    
+    return [
+        {
+            "flight_id": f"AA{number}",
+            "latitude": lat,
+            "longitude": lon,
+            "altitude": altitude,
+            "speed": speed,
+            "heading": heading,
+            "status": status,
+            "timestamp": timestamp,
+            "aircraft_type": aircraft_type,
+            "airline": airline,
+            "departure": departure,
+            "arrival": arrival
+        }
+        for number, lat, lon, altitude, speed, heading, status, aircraft_type, airline, departure, arrival
+        in zip(flight_numbers, lats, lons, altitudes, speeds, headings, statuses, aircraft, airlines, departures, arrivals)
+    ]
+
+def test_flight_data():
+    """Generate realistic flight data for testing"""
+    return make_batch(1)[0]
+
+def random_waypoints(num_points=10):
+    """Generate a NYC to LA route as (lat, lon, altitude, speed, heading, status) waypoints"""
+    # Starting position (New York)
+    start_lat, start_lon = 40.7128, -74.0060
+    # Ending position (Los Angeles)
+    end_lat, end_lon = 34.0522, -118.2437
+    
+    # Interpolate between start and end positions, with some random variation
+    p = np.linspace(0, 1, num_points)
+    lats = np.round(start_lat + (end_lat - start_lat) * p + np.random.uniform(-0.5, 0.5, num_points), 6)
+    lons = np.round(start_lon + (end_lon - start_lon) * p + np.random.uniform(-0.5, 0.5, num_points), 6)
+    altitudes = np.random.randint(30000, 40001, num_points)
+    speeds = np.random.randint(400, 551, num_points)
+    headings = np.random.randint(250, 291, num_points)  # Generally westbound
+    statuses = ["en-route"] * (num_points - 1) + ["landed"]
+    
+    return list(zip(lats.tolist(), lons.tolist(), altitudes.tolist(), speeds.tolist(), headings.tolist(), statuses))
+
+def test_backend():
+    """Check that the backend is reachable"""
+    try:
+        response = SESSION.get(BASE_URL)
+        log.info("✅ Backend is running!")
+        log.info(f"Response: {response.json()}")
+        return True
+    except Exception as e:
+        log.info(f"❌ Backend not running: {e}")
+        return False
+
+def send_flight_data(flight_data):
+    """Send flight data to the API"""
+    try:
+        response = post_json(f"{API_BASE_URL}/flight/update", flight_data)
+        if response.status_code == 202:
+            log.info(f"✅ Sent data for flight {flight_data['flight_id']}")
+            return True
+        else:
+            fail(response, "Failed to send data")
+            return False
+    except Exception as e:
+        log.info(f"❌ Error sending data: {e}")
+        return False
+
+def simulate_flight_journey(flight_id, waypoints):
+    """Send every (lat, lon, altitude, speed, heading, status) waypoint as a tracking point"""
+    log.info(f"\n🚀 Simulating flight journey for {flight_id}")
+    
+    # Every point is timestamped relative to one clock read, one hour apart
+    base = datetime.now()
+    total = len(waypoints)
+    
+    # Constant fields are built once; points are sent concurrently, so each gets its own copy
+    template = {
+        "flight_id": flight_id,
+        "aircraft_type": "Boeing 737",
+        "airline": "American Airlines",
+        "departure": "JFK",
+        "arrival": "LAX"
+    }
+    
+    def send_point(i, point):
+        lat, lon, altitude, speed, heading, status = point
+        flight_data = {
+            **template,
+            "latitude": lat,
+            "longitude": lon,
+            "altitude": altitude,
+            "speed": speed,
+            "heading": heading,
+            "status": status,
+            "timestamp": (base - timedelta(hours=total - i)).isoformat()
+        }
+    
+        try:
+            response = post_json(f"{API_BASE_URL}/flight/update", flight_data)
+            if response.status_code == 202:
+                log.info(f"✅ Point {i+1}/{total} sent: {status} at {lat:.2f}, {lon:.2f}")
+            else:
+                fail(response, f"Failed to send point {i+1}")
+        except Exception as e:
+            log.info(f"❌ Error sending point {i+1}: {e}")
+    
+    # Intermediate points are independent, so post them concurrently; the final point
+    # goes last so the flight document ends in its landed state
+    last = total - 1
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(send_point, range(last), waypoints[:last]))
+    send_point(last, waypoints[last])
+
+def get_flight_location(flight_id, timestamp=None):
+    """Get flight location (current or at specific time)"""
+    try:
+        if timestamp:
+            url = f"{API_BASE_URL}/flight/{flight_id}/location?timestamp={timestamp}"
+        else:
+            url = f"{API_BASE_URL}/flight/{flight_id}"
+    
+        response = _cached_get(url)
+        if response.status_code == 200:
+            data = response.json()
+            # Only the point-in-time endpoint nests the fields under "location"
+            loc = data['location'] if timestamp else data
+            # One record per report, so concurrent reads never interleave their lines
+            log.info(
+                f"📍 Flight {flight_id} location:\n"
+                f"   Position: {loc['latitude']:.6f}, {loc['longitude']:.6f}\n"
+                f"   Altitude: {loc['altitude']} ft\n"
+                f"   Speed: {loc['speed']} knots\n"
+                f"   Heading: {loc['heading']}°\n"
+                f"   Status: {loc['status']}"
+            )
+            return data
+        else:
+            fail(response, "Failed to get flight location")
+            return None
+    except Exception as e:
+        log.info(f"❌ Error getting flight location: {e}")
+        return None
+
+def get_flight_history(flight_id):
+    """Get complete flight tracking history"""
+    try:
+        response = _cached_get(f"{API_BASE_URL}/flight/{flight_id}/history")
+        if response.status_code == 200:
+            history = response.json()
+            log.info(f"📊 Flight {flight_id} has {len(history)} tracking points")
+            return history
+        else:
+            fail(response, "Failed to get flight history")
+            return None
+    except Exception as e:
+        log.info(f"❌ Error getting flight history: {e}")
+        return None
+
+def get_active_flights():
+    """Get all active flights"""
+    try:
+        response = _cached_get(f"{API_BASE_URL}/flights")
+        if response.status_code == 200:
+            flights = response.json()
+            lines = [f"🛫 Found {len(flights)} active flights"]
+            for flight_id, status, lat, lon in map(active_fields, flights):
+                lines.append(f"   {flight_id}: {status} at {lat:.4f}, {lon:.4f}")
+            log.info("\n".join(lines))
+            return flights
+        else:
+            fail(response, "Failed to get active flights")
+            return None
+    except Exception as e:
+        log.info(f"❌ Error getting active flights: {e}")
+        return None
+
+def complete_flight(flight_id):
+    """Mark flight as completed and move to logs"""
+    try:
+        response = SESSION.post(f"{API_BASE_URL}/flight/{flight_id}/complete")
+        _clear_get_cache()
+        if response.status_code == 200:
+            log.info(f"✅ Flight {flight_id} completed and moved to logs")
+            return True
+        else:
+            fail(response, "Failed to complete flight")
+            return False
+    except Exception as e:
+        log.info(f"❌ Error completing flight: {e}")
+        return False
+
+def get_completed_flights():
+    """Get all completed flights from logs"""
+    try:
+        response = SESSION.get(f"{API_BASE_URL}/flights/logs")
+        if response.status_code == 200:
+            logs = response.json()
+            log.info(f"📋 Found {len(logs)} completed flights in logs")
+            for flight_id, completed_at, total_points in map(completed_fields, logs):
+                log.info(f"   {flight_id}: completed at {completed_at} with {total_points} tracking points")
+            return logs
+        else:
+            fail(response, "Failed to get completed flights")
+            return None
+    except Exception as e:
+        log.info(f"❌ Error getting completed flights: {e}")
+        return None
+
+async def read_phase(flight_id):
+    """Fetch current location, location 2 hours ago, history and active flights concurrently"""
+    past_time = (datetime.now() - timedelta(hours=2)).isoformat()
+    # Each blocking GET runs in a worker thread over the shared keep-alive pool
+    return await asyncio.gather(
+        asyncio.to_thread(get_flight_location, flight_id),
+        asyncio.to_thread(get_flight_location, flight_id, past_time),
+        asyncio.to_thread(get_flight_history, flight_id),
+        asyncio.to_thread(get_active_flights)
+    )
+
+def run_suite(flight_id, waypoints, extra_flights=0):
+    """Run the end-to-end API test suite against one simulated journey; returns False if the backend is down"""
+    log.info("🛩️  FlightAware System Test")
+    log.info("=" * 50)
+    
+    # Test 1: Check backend
+    if not test_backend():
+        log.info("Please start the backend first: python -m backend.app")
+        return False
+    
+    # Test 2: Send individual flight data
+    log.info("\n2️⃣ Testing individual flight data submission...")
+    send_flight_data(test_flight_data())
+    
+    # Test 3: Simulate a complete flight journey
+    log.info("\n3️⃣ Simulating complete flight journey...")
+    simulate_flight_journey(flight_id, waypoints)
+    
+    # Tests 4-7 are independent reads, so they are issued concurrently
+    log.info("\n4️⃣-7️⃣ Reading current location, location 2 hours ago, history and active flights...")
+    asyncio.run(read_phase(flight_id))
+    
+    # Test 8: Complete the flight
+    log.info("\n8️⃣ Completing flight...")
+    complete_flight(flight_id)
+    
+    # Test 9: Get completed flights
+    log.info("\n9️⃣ Getting completed flights...")
+    get_completed_flights()
+    
+    # Test 10: Leave some more test flights active
+    if extra_flights:
+        log.info("\n🔟 Adding more test flights...")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(send_flight_data, make_batch(extra_flights)))
+        get_active_flights()
+    
+    log.info("\n✅ All tests completed!")
+    return True
@@ -0,0 +1,65 @@
+# backend/airports.py
+
+import math
+import numpy as np
+
+# Airport coordinates database shared by the API and the simulators
+AIRPORTS = {
+    "JFK": {"lat": 40.6413, "lon": -73.7781, "name": "John F. Kennedy International"},
+    "LAX": {"lat": 33.9416, "lon": -118.4085, "name": "Los Angeles International"},
+    "ORD": {"lat": 41.9786, "lon": -87.9048, "name": "Chicago O'Hare International"},
+    "DFW": {"lat": 32.8968, "lon": -97.0380, "name": "Dallas/Fort Worth International"},
+    "ATL": {"lat": 33.6407, "lon": -84.4277, "name": "Hartsfield-Jackson Atlanta International"},
+    "DEN": {"lat": 39.8561, "lon": -104.6737, "name": "Denver International"},
+    "SFO": {"lat": 37.6213, "lon": -122.3790, "name": "San Francisco International"},
+    "SEA": {"lat": 47.4502, "lon": -122.3088, "name": "Seattle-Tacoma International"},
+    "BOS": {"lat": 42.3656, "lon": -71.0096, "name": "Logan International"},
+    "MIA": {"lat": 25.7959, "lon": -80.2871, "name": "Miami International"},
+    "LHR": {"lat": 51.4700, "lon": -0.4543, "name": "London Heathrow"},
+    "CDG": {"lat": 49.0097, "lon": 2.5479, "name": "Charles de Gaulle"},
+    "NRT": {"lat": 35.7720, "lon": 140.3928, "name": "Narita International"},
+    "DXB": {"lat": 25.2532, "lon": 55.3657, "name": "Dubai International"}
+}
+
+# Same coordinates as parallel arrays, indexed through IDX
+AIRPORT_CODES = list(AIRPORTS)
+AIRPORT_LAT = np.array([AIRPORTS[code]["lat"] for code in AIRPORT_CODES])
+AIRPORT_LON = np.array([AIRPORTS[code]["lon"] for code in AIRPORT_CODES])
+IDX = {code: i for i, code in enumerate(AIRPORT_CODES)}
+
+# Airport coordinates in radians, precomputed once at import
+AIRPORTS_RAD = {code: (math.radians(v["lat"]), math.radians(v["lon"])) for code, v in AIRPORTS.items()}
+
+def _equirect_rad(lat1r, lon1r, lat2r, lon2r):
+    """Equirectangular distance approximation in kilometers for coordinates in radians"""
+    # Wrap the longitude difference into [-pi, pi) so routes across the antimeridian take the short way
+    dlon = (lon2r - lon1r + math.pi) % (2 * math.pi) - math.pi
+    x = dlon * math.cos((lat1r + lat2r) / 2)
+    y = lat2r - lat1r
+    return 6371 * math.sqrt(x * x + y * y)
+
+def calculate_route_progress(current_lat, current_lon, source, destination):
+    """Calculate flight progress percentage from source to destination"""
+    source_rad = AIRPORTS_RAD.get(source)
+    dest_rad = AIRPORTS_RAD.get(destination)
+    if not source_rad or not dest_rad:
+        return 0
+
+    source_lat_r, source_lon_r = source_rad
+    dest_lat_r, dest_lon_r = dest_rad
+
+    # Calculate total distance (equirectangular is accurate enough for a progress percentage)
+    total_distance = _equirect_rad(source_lat_r, source_lon_r, dest_lat_r, dest_lon_r)
+
+    # Calculate distance from current position to destination
+    current_to_dest = _equirect_rad(
+        math.radians(current_lat), math.radians(current_lon),
+        dest_lat_r, dest_lon_r
+    )
+
+    # Calculate progress percentage
+    if total_distance == 0:
+        return 100
+
+    progress = max(0, min(100, ((total_distance - current_to_dest) / total_distance) * 100))
+    return round(progress, 2)
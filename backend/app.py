@@ -1,134 +1,165 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from backend import database
-import json
+from backend.airports import AIRPORTS, calculate_route_progress
+from bson import ObjectId
+from pymongo import DeleteMany
+import bson
+import atexit
+import ciso8601
+import functools
+import logging
 import math
+import os
+import queue
+import uuid
+import msgspec
+import numpy as np
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, List, Union
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the NumPy distance kernel is used instead
+    njit = None
 
 app = Flask(__name__)
 CORS(app)
 
-# Airport coordinates database
-AIRPORTS = {
-    "JFK": {"lat": 40.6413, "lon": -73.7781, "name": "John F. Kennedy International"},
-    "LAX": {"lat": 33.9416, "lon": -118.4085, "name": "Los Angeles International"},
-    "ORD": {"lat": 41.9786, "lon": -87.9048, "name": "Chicago O'Hare International"},
-    "DFW": {"lat": 32.8968, "lon": -97.0380, "name": "Dallas/Fort Worth International"},
-    "ATL": {"lat": 33.6407, "lon": -84.4277, "name": "Hartsfield-Jackson Atlanta International"},
-    "DEN": {"lat": 39.8561, "lon": -104.6737, "name": "Denver International"},
-    "SFO": {"lat": 37.6213, "lon": -122.3790, "name": "San Francisco International"},
-    "SEA": {"lat": 47.4502, "lon": -122.3088, "name": "Seattle-Tacoma International"},
-    "BOS": {"lat": 42.3656, "lon": -71.0096, "name": "Logan International"},
-    "MIA": {"lat": 25.7959, "lon": -80.2871, "name": "Miami International"},
-    "LHR": {"lat": 51.4700, "lon": -0.4543, "name": "London Heathrow"},
-    "CDG": {"lat": 49.0097, "lon": 2.5479, "name": "Charles de Gaulle"},
-    "NRT": {"lat": 35.7720, "lon": 140.3928, "name": "Narita International"},
-    "DXB": {"lat": 25.2532, "lon": 55.3657, "name": "Dubai International"}
-}
-
-def calculate_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance between two points in kilometers"""
-    R = 6371  # Earth's radius in kilometers
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * 
-         math.sin(dlon/2) * math.sin(dlon/2))
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
-
-def calculate_route_progress(current_lat, current_lon, source, destination):
-    """Calculate flight progress percentage from source to destination"""
-    if not source or not destination or source not in AIRPORTS or destination not in AIRPORTS:
-        return 0
-    
-    source_coords = AIRPORTS[source]
-    dest_coords = AIRPORTS[destination]
-    
-    # Calculate total distance
-    total_distance = calculate_distance(
-        source_coords["lat"], source_coords["lon"],
-        dest_coords["lat"], dest_coords["lon"]
-    )
-    
-    # Calculate distance from current position to destination
-    current_to_dest = calculate_distance(
-        current_lat, current_lon,
-        dest_coords["lat"], dest_coords["lon"]
+# Non-blocking logging: records are queued and written to stderr by a listener thread
+logger = logging.getLogger("flights")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+logger.addHandler(QueueHandler(_log_queue))
+atexit.register(_log_listener.stop)
+
+# Background executor for long-running batch jobs such as auto-completion
+_job_executor = ThreadPoolExecutor(max_workers=2)
+
+
+def _json_default(obj):
+    """Serialize types orjson does not know about (MongoDB ObjectId)"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError
+
+
+def ojson(obj, status=200):
+    """Serialize obj to a JSON response with orjson (handles datetime and NumPy natively)"""
+    return app.response_class(
+        orjson.dumps(obj, default=_json_default, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
     )
-    
-    # Calculate progress percentage
-    if total_distance == 0:
-        return 100
-    
-    progress = max(0, min(100, ((total_distance - current_to_dest) / total_distance) * 100))
-    return round(progress, 2)
 
-def get_route_waypoints(source, destination, num_points=20):
-    """Generate waypoints for a flight route"""
-    if not source or not destination or source not in AIRPORTS or destination not in AIRPORTS:
-        return []
-    
-    source_coords = AIRPORTS[source]
-    dest_coords = AIRPORTS[destination]
-    
-    waypoints = []
-    for i in range(num_points + 1):
-        progress = i / num_points
-        lat = source_coords["lat"] + (dest_coords["lat"] - source_coords["lat"]) * progress
-        lon = source_coords["lon"] + (dest_coords["lon"] - source_coords["lon"]) * progress
-        waypoints.append({"lat": lat, "lon": lon, "progress": progress * 100})
-    
-    return waypoints
 
+def flushes_writes(view):
+    """Flush this process's buffered writes before the view runs (read-your-writes within one worker only)"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        database.flush_pending_writes()
+        return view(*args, **kwargs)
+    return wrapper
 
-# --------------------------
-#  1️⃣ Add or update flight data (Enhanced with better validation)
-# --------------------------
-@app.route('/api/flight/update', methods=['POST'])
-def update_flight():
-    data = request.get_json()
 
-    # Enhanced required fields for realistic flight tracking
-    required_fields = ["flight_id", "latitude", "longitude", "altitude", "speed", "heading", "status", "timestamp"]
-    if not all(field in data for field in required_fields):
-        return jsonify({"error": "Missing one or more required fields"}), 400
+# Largest batch accepted by /api/flight/update_bulk
+MAX_BULK_UPDATES = 256
 
-    # Validate data types and ranges
-    try:
-        data["latitude"] = float(data["latitude"])
-        data["longitude"] = float(data["longitude"])
-        data["altitude"] = float(data["altitude"])
-        data["speed"] = float(data["speed"])
-        data["heading"] = float(data["heading"])
-        
-        # Validate coordinate ranges
-        if not (-90 <= data["latitude"] <= 90):
-            return jsonify({"error": "Latitude must be between -90 and 90"}), 400
-        if not (-180 <= data["longitude"] <= 180):
-            return jsonify({"error": "Longitude must be between -180 and 180"}), 400
-        if data["altitude"] < 0:
-            return jsonify({"error": "Altitude must be positive"}), 400
-        if data["speed"] < 0:
-            return jsonify({"error": "Speed must be positive"}), 400
-        if not (0 <= data["heading"] <= 360):
-            return jsonify({"error": "Heading must be between 0 and 360"}), 400
-            
-    except (ValueError, TypeError):
-        return jsonify({"error": "Invalid data types for numeric fields"}), 400
+# Paths longer than this use the Numba distance kernel when numba is installed
+NUMBA_MIN_POINTS = 2000
 
-    # Convert timestamp to datetime
-    try:
-        data["timestamp"] = datetime.fromisoformat(data["timestamp"].replace('Z', '+00:00'))
-    except ValueError:
-        return jsonify({"error": "Invalid timestamp format. Use ISO format"}), 400
+# AIRPORTS never changes, so its JSON body is serialized once
+_AIRPORTS_JSON = orjson.dumps(AIRPORTS)
+
+# Fields returned by the active flight list endpoints
+ACTIVE_FLIGHT_FIELDS = {
+    "flight_id": 1, "latitude": 1, "longitude": 1, "altitude": 1, "speed": 1, "heading": 1,
+    "status": 1, "last_updated": 1, "received_at": 1, "source": 1, "destination": 1, "route_progress": 1
+}
+
+@functools.lru_cache(maxsize=1024)
+def get_route_waypoints(source, destination, num_points=20):
+    """Generate waypoints for a flight route (cached per source/destination pair)"""
+    source_coords = AIRPORTS.get(source)
+    dest_coords = AIRPORTS.get(destination)
+    if not source_coords or not dest_coords:
+        return ()
+    
+    lats = np.linspace(source_coords["lat"], dest_coords["lat"], num_points + 1)
+    lons = np.linspace(source_coords["lon"], dest_coords["lon"], num_points + 1)
+    progs = np.linspace(0, 100, num_points + 1)
+    
+    # Returned as a tuple since the cached result is shared between requests
+    return tuple(
+        {"lat": lat, "lon": lon, "progress": progress}
+        for lat, lon, progress in zip(lats.tolist(), lons.tolist(), progs.tolist())
+    )
 
-    # Add additional metadata
-    data["received_at"] = datetime.now()
-    
-    # Insert into tracking collection
-    database.tracking.insert_one(data)
 
+class FlightUpdate(msgspec.Struct):
+    """Payload accepted by POST /api/flight/update"""
+    flight_id: str
+    latitude: float
+    longitude: float
+    altitude: float
+    speed: float
+    heading: float
+    status: str
+    timestamp: str
+    aircraft_type: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    airline: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    departure: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    arrival: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    source: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    destination: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    route: Any = msgspec.UNSET
+
+    def __post_init__(self):
+        # Validate coordinate ranges
+        if not (-90 <= self.latitude <= 90):
+            raise ValueError("Latitude must be between -90 and 90")
+        if not (-180 <= self.longitude <= 180):
+            raise ValueError("Longitude must be between -180 and 180")
+        if self.altitude < 0:
+            raise ValueError("Altitude must be positive")
+        if self.speed < 0:
+            raise ValueError("Speed must be positive")
+        if not (0 <= self.heading <= 360):
+            raise ValueError("Heading must be between 0 and 360")
+        # route is free-form, so reject values MongoDB cannot store before they reach the write buffer
+        if self.route is not msgspec.UNSET:
+            try:
+                bson.encode({"route": self.route})
+            except Exception:
+                raise ValueError("Route cannot be stored (e.g. an integer beyond 64 bits)")
+
+
+class BulkFlightUpdate(msgspec.Struct):
+    """Payload accepted by POST /api/flight/update_bulk"""
+    updates: List[FlightUpdate]
+
+
+def to_utc(timestamp):
+    """Convert a parsed timestamp to UTC; naive timestamps are taken to be in the server's local time"""
+    return timestamp.astimezone(timezone.utc)
+
+
+def build_flight_update(data):
+    """Add derived fields to a validated tracking point and build its flight $set document"""
+    # Store timestamps in UTC so the serialized offset (OPT_NAIVE_UTC on read) is correct
+    data["timestamp"] = to_utc(data["timestamp"])
+    
+    # Add additional metadata (received_at is stamped when the write buffer is flushed).
+    # The GeoJSON point is stored as "geo": clients read a "location" key as a
+    # point-in-time result from /api/flight/<id>/location
+    data["geo"] = {"type": "Point", "coordinates": [data["longitude"], data["latitude"]]}
+    
     # Update or create flight entry with additional fields
     flight_update = {
         "flight_id": data["flight_id"],
@@ -138,8 +169,8 @@ def update_flight():
         "speed": data["speed"],
         "heading": data["heading"],
         "status": data["status"],
-        "last_updated": data["timestamp"],
-        "received_at": data["received_at"]
+        "geo": data["geo"],
+        "last_updated": data["timestamp"]
     }
     
     # Add optional fields if provided
@@ -160,77 +191,135 @@ def update_flight():
             flight_update["status"] = "landed"
             # Mark for auto-completion
             flight_update["ready_for_completion"] = True
+    
+    return flight_update
 
-    database.flights.update_one(
-        {"flight_id": data["flight_id"]},
-        {"$set": flight_update},
-        upsert=True
-    )
 
-    return jsonify({
+# --------------------------
+#  1️⃣ Add or update flight data (Enhanced with better validation)
+# --------------------------
+@app.route('/api/flight/update', methods=['POST'])
+def update_flight():
+    # Decode and validate the body in one pass; unset optional fields are omitted from data
+    try:
+        data = msgspec.to_builtins(
+            msgspec.json.decode(request.get_data(), type=FlightUpdate, strict=False)
+        )
+    except msgspec.ValidationError as e:
+        return ojson({"error": str(e)}, 400)
+    except msgspec.DecodeError:
+        return ojson({"error": "Request body must be valid JSON"}, 400)
+
+    # Convert timestamp to datetime
+    try:
+        data["timestamp"] = ciso8601.parse_datetime(data["timestamp"])
+    except (ValueError, TypeError):
+        return ojson({"error": "Invalid timestamp format. Use ISO format"}, 400)
+
+    # Queue the tracking point and flight update; they are written in bulk shortly after
+    database.buffer_flight_update(data, build_flight_update(data))
+
+    return ojson({
         "status": "success",
         "message": f"Data received for flight {data['flight_id']}",
         "flight_id": data["flight_id"],
-        "timestamp": data["timestamp"].isoformat()
-    })
+        "timestamp": data["timestamp"]
+    }, 202)
+
+
+# --------------------------
+#  1.5️⃣ Add or update many flights in one request
+# --------------------------
+@app.route('/api/flight/update_bulk', methods=['POST'])
+def update_flights_bulk():
+    try:
+        batch = msgspec.json.decode(request.get_data(), type=BulkFlightUpdate, strict=False)
+    except msgspec.ValidationError as e:
+        return ojson({"error": str(e)}, 400)
+    except msgspec.DecodeError:
+        return ojson({"error": "Request body must be valid JSON"}, 400)
+
+    if len(batch.updates) > MAX_BULK_UPDATES:
+        return ojson({"error": f"At most {MAX_BULK_UPDATES} updates per request"}, 400)
+
+    # Validate every record before queueing any of them
+    records = []
+    for i, update in enumerate(batch.updates):
+        data = msgspec.to_builtins(update)
+        try:
+            data["timestamp"] = ciso8601.parse_datetime(data["timestamp"])
+        except (ValueError, TypeError):
+            return ojson({"error": f"Invalid timestamp format at updates[{i}]. Use ISO format"}, 400)
+        records.append(data)
+
+    for data in records:
+        database.buffer_flight_update(data, build_flight_update(data))
+
+    return ojson({
+        "status": "success",
+        "message": f"Data received for {len(records)} flight updates",
+        "count": len(records)
+    }, 202)
 
 
 # --------------------------
 #  2️⃣ Get latest location
 # --------------------------
 @app.route('/api/flight/<flight_id>', methods=['GET'])
+@flushes_writes
 def get_latest_flight_data(flight_id):
     flight = database.flights.find_one({"flight_id": flight_id})
     if not flight:
-        return jsonify({"error": "Flight not found"}), 404
+        return ojson({"error": "Flight not found"}, 404)
 
-    flight["_id"] = str(flight["_id"])
-    flight["last_updated"] = flight["last_updated"].isoformat()
-    flight["received_at"] = flight["received_at"].isoformat()
-    return jsonify(flight)
+    return ojson(flight)
 
 
 # --------------------------
 #  2.5️⃣ Get flight location at specific time
 # --------------------------
 @app.route('/api/flight/<flight_id>/location', methods=['GET'])
+@flushes_writes
 def get_flight_location_at_time(flight_id):
     # Get timestamp parameter
     timestamp_str = request.args.get('timestamp')
     if not timestamp_str:
-        return jsonify({"error": "Timestamp parameter required"}), 400
+        return ojson({"error": "Timestamp parameter required"}, 400)
     
     try:
-        target_time = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+        target_time = to_utc(ciso8601.parse_datetime(timestamp_str))
     except ValueError:
-        return jsonify({"error": "Invalid timestamp format. Use ISO format"}), 400
-    
-    # Find the closest tracking point to the requested time
-    tracking_points = list(database.tracking.find({
-        "flight_id": flight_id,
-        "timestamp": {"$lte": target_time}
-    }).sort("timestamp", -1).limit(1))
+        return ojson({"error": "Invalid timestamp format. Use ISO format"}, 400)
+    
+    # Find the closest tracking point to the requested time, shaped server-side
+    tracking_points = list(database.tracking.aggregate([
+        {"$match": {"flight_id": flight_id, "timestamp": {"$lte": target_time}}},
+        {"$sort": {"timestamp": -1}},
+        {"$limit": 1},
+        {"$project": {
+            "_id": 0,
+            "timestamp": 1,
+            "location": {
+                "latitude": "$latitude",
+                "longitude": "$longitude",
+                "altitude": "$altitude",
+                "speed": "$speed",
+                "heading": "$heading",
+                "status": "$status"
+            }
+        }}
+    ]))
     
     if not tracking_points:
-        return jsonify({"error": "No tracking data found for the specified time"}), 404
+        return ojson({"error": "No tracking data found for the specified time"}, 404)
     
     point = tracking_points[0]
-    point["_id"] = str(point["_id"])
-    point["timestamp"] = point["timestamp"].isoformat()
-    point["received_at"] = point["received_at"].isoformat()
     
-    return jsonify({
+    return ojson({
         "flight_id": flight_id,
-        "requested_time": target_time.isoformat(),
+        "requested_time": target_time,
         "actual_time": point["timestamp"],
-        "location": {
-            "latitude": point["latitude"],
-            "longitude": point["longitude"],
-            "altitude": point["altitude"],
-            "speed": point["speed"],
-            "heading": point["heading"],
-            "status": point["status"]
-        }
+        "location": point["location"]
     })
 
 
@@ -238,16 +327,15 @@ def get_flight_location_at_time(flight_id):
 #  3️⃣ Get full tracking history
 # --------------------------
 @app.route('/api/flight/<flight_id>/history', methods=['GET'])
+@flushes_writes
 def get_flight_history(flight_id):
-    history = list(database.tracking.find({"flight_id": flight_id}).sort("timestamp", 1))
+    history = list(database.tracking.find(
+        {"flight_id": flight_id}, {"_id": 0, "flight_id": 0}
+    ).sort("timestamp", 1))
     if not history:
-        return jsonify({"error": "No tracking data found"}), 404
+        return ojson({"error": "No tracking data found"}, 404)
 
-    for item in history:
-        item["_id"] = str(item["_id"])
-        item["timestamp"] = item["timestamp"].isoformat()
-
-    return jsonify(history)
+    return ojson(history)
 
 
 # --------------------------
@@ -255,43 +343,58 @@ def get_flight_history(flight_id):
 # --------------------------
 @app.route('/api/flight/<flight_id>/complete', methods=['POST'])
 def complete_flight(flight_id):
-    # Find tracking data
-    path_data = list(database.tracking.find({"flight_id": flight_id}).sort("timestamp", 1))
-    if not path_data:
-        return jsonify({"error": "No data for this flight"}), 404
-
-    # Get flight details
-    flight_details = database.flights.find_one({"flight_id": flight_id})
-    
-    # Save to logs with complete flight information
-    log_entry = {
-        "flight_id": flight_id,
-        "path": path_data,
-        "flight_details": flight_details,
-        "completed_at": datetime.now(),
-        "total_tracking_points": len(path_data),
-        "departure_time": path_data[0]["timestamp"] if path_data else None,
-        "arrival_time": path_data[-1]["timestamp"] if path_data else None,
-        "total_duration_minutes": 0
-    }
-    
-    # Calculate total duration
-    if path_data and len(path_data) > 1:
-        start_time = path_data[0]["timestamp"]
-        end_time = path_data[-1]["timestamp"]
-        duration = (end_time - start_time).total_seconds() / 60
-        log_entry["total_duration_minutes"] = round(duration, 2)
-
-    database.logs.insert_one(log_entry)
+    # Make sure buffered tracking points are included
+    database.flush_pending_writes()
+
+    # Tag this completion so its log entry can be told apart from earlier ones for the same flight
+    completion_id = uuid.uuid4().hex
+
+    # Build the log entry and write it to the logs collection entirely server-side
+    database.tracking.with_options(write_concern=database.logs.write_concern).aggregate([
+        {"$match": {"flight_id": flight_id}},
+        {"$sort": {"timestamp": 1}},
+        {"$group": {
+            "_id": "$flight_id",
+            "path": {"$push": "$$ROOT"},
+            "departure_time": {"$first": "$timestamp"},
+            "arrival_time": {"$last": "$timestamp"},
+            "total_tracking_points": {"$sum": 1}
+        }},
+        {"$lookup": {
+            "from": database.flights.name,
+            "localField": "_id",
+            "foreignField": "flight_id",
+            "as": "flight_details"
+        }},
+        {"$addFields": {
+            "flight_id": "$_id",
+            "flight_details": {"$arrayElemAt": ["$flight_details", 0]},
+            "completed_at": "$$NOW",
+            "completion_id": completion_id,
+            "total_duration_minutes": {"$round": [
+                {"$divide": [{"$subtract": ["$arrival_time", "$departure_time"]}, 60000]}, 2
+            ]}
+        }},
+        # Let $merge assign a fresh ObjectId so a flight can be logged more than once
+        {"$project": {"_id": 0}},
+        {"$merge": {"into": database.logs.name, "whenMatched": "fail", "whenNotMatched": "insert"}}
+    ])
+
+    log_entry = database.logs.find_one(
+        {"completion_id": completion_id},
+        {"_id": 0, "arrival_time": 1, "total_tracking_points": 1, "total_duration_minutes": 1}
+    )
+    if log_entry is None:
+        return ojson({"error": "No data for this flight"}, 404)
 
-    # Remove from current collections
-    database.tracking.delete_many({"flight_id": flight_id})
+    # Remove only the logged points; anything flushed after the $merge stays for the next completion
+    database.tracking.delete_many({"flight_id": flight_id, "timestamp": {"$lte": log_entry["arrival_time"]}})
     database.flights.delete_one({"flight_id": flight_id})
 
-    return jsonify({
+    return ojson({
         "status": "success", 
         "message": f"Flight {flight_id} completed and logged.",
-        "total_points": len(path_data),
+        "total_points": log_entry["total_tracking_points"],
         "duration_minutes": log_entry["total_duration_minutes"]
     })
 
@@ -300,12 +403,10 @@ def complete_flight(flight_id):
 #  5️⃣ Get all active flights
 # --------------------------
 @app.route('/api/flights', methods=['GET'])
+@flushes_writes
 def get_all_active_flights():
-    active = list(database.flights.find())
-    for f in active:
-        f["_id"] = str(f["_id"])
-        f["last_updated"] = f["last_updated"].isoformat()
-    return jsonify(active)
+    active = list(database.flights.find({}, ACTIVE_FLIGHT_FIELDS))
+    return ojson(active)
 
 
 # --------------------------
@@ -313,15 +414,27 @@ def get_all_active_flights():
 # --------------------------
 @app.route('/api/flights/logs', methods=['GET'])
 def get_all_completed_flights():
-    logs = list(database.logs.find().sort("completed_at", -1))
-    for log in logs:
-        log["_id"] = str(log["_id"])
-        log["completed_at"] = log["completed_at"].isoformat()
-        if log.get("departure_time"):
-            log["departure_time"] = log["departure_time"].isoformat()
-        if log.get("arrival_time"):
-            log["arrival_time"] = log["arrival_time"].isoformat()
-    return jsonify(logs)
+    # The full tracking path is only served by the per-flight log endpoint
+    logs = list(database.logs.find(
+        {}, {"path": 0, "flight_details._id": 0}
+    ).sort("completed_at", -1))
+    return ojson(logs)
+
+
+# --------------------------
+#  6.5️⃣ Get a completed flight with its full path
+# --------------------------
+@app.route('/api/flights/logs/<flight_id>', methods=['GET'])
+def get_completed_flight(flight_id):
+    log = database.logs.find_one(
+        {"flight_id": flight_id},
+        {"path._id": 0, "flight_details._id": 0},
+        sort=[("completed_at", -1)]
+    )
+    if not log:
+        return ojson({"error": "Completed flight not found"}, 404)
+
+    return ojson(log)
 
 
 # --------------------------
@@ -329,6 +442,52 @@ def get_all_completed_flights():
 # --------------------------
 @app.route('/api/flights/auto-complete', methods=['POST'])
 def auto_complete_landed_flights():
+    # Queue the job and return immediately; progress is tracked in completion_jobs
+    job_id = uuid.uuid4().hex
+    database.jobs.insert_one({"job_id": job_id, "status": "queued", "created_at": datetime.now(timezone.utc)})
+    _job_executor.submit(_run_auto_complete, job_id)
+
+    return ojson({
+        "status": "accepted",
+        "message": "Auto-complete job queued",
+        "job_id": job_id
+    }, 202)
+
+
+@app.route('/api/flights/auto-complete/<job_id>', methods=['GET'])
+def get_auto_complete_job(job_id):
+    job = database.jobs.find_one({"job_id": job_id}, {"_id": 0})
+    if not job:
+        return ojson({"error": "Job not found"}, 404)
+    return ojson(job)
+
+
+def _run_auto_complete(job_id):
+    """Move every landed flight to the logs collection (runs on the background executor)"""
+    database.jobs.update_one({"job_id": job_id}, {"$set": {"status": "running", "started_at": datetime.now(timezone.utc)}})
+    try:
+        completed_count = _auto_complete_landed_flights()
+    except Exception as e:
+        logger.exception("❌ Auto-complete job %s failed", job_id)
+        database.jobs.update_one({"job_id": job_id}, {"$set": {
+            "status": "failed",
+            "error": str(e),
+            "finished_at": datetime.now(timezone.utc)
+        }})
+        return
+
+    database.jobs.update_one({"job_id": job_id}, {"$set": {
+        "status": "completed",
+        "completed_count": completed_count,
+        "message": f"Auto-completed {completed_count} landed flights",
+        "finished_at": datetime.now(timezone.utc)
+    }})
+
+
+def _auto_complete_landed_flights():
+    # Make sure buffered tracking points are included
+    database.flush_pending_writes()
+
     # Find flights with status "landed" or ready for completion
     landed_flights = list(database.flights.find({
         "$or": [
@@ -337,7 +496,8 @@ def auto_complete_landed_flights():
             {"route_progress": {"$gte": 95}}
         ]
     }))
-    completed_count = 0
+    log_entries = []
+    completed_ids = []
     
     for flight in landed_flights:
         flight_id = flight["flight_id"]
@@ -345,9 +505,6 @@ def auto_complete_landed_flights():
         # Get tracking data
         path_data = list(database.tracking.find({"flight_id": flight_id}).sort("timestamp", 1))
         if path_data:
-            # Get flight details
-            flight_details = database.flights.find_one({"flight_id": flight_id})
-            
             # Calculate flight statistics
             total_duration = 0
             departure_time = path_data[0]["timestamp"] if path_data else None
@@ -359,11 +516,11 @@ def auto_complete_landed_flights():
                 total_duration = (end_time - start_time).total_seconds() / 60
             
             # Save to logs with complete flight information
-            log_entry = {
+            log_entries.append({
                 "flight_id": flight_id,
                 "path": path_data,
-                "flight_details": flight_details,
-                "completed_at": datetime.now(),
+                "flight_details": flight,
+                "completed_at": datetime.now(timezone.utc),
                 "total_tracking_points": len(path_data),
                 "departure_time": departure_time,
                 "arrival_time": arrival_time,
@@ -379,57 +536,82 @@ def auto_complete_landed_flights():
                     "airline": flight.get("airline", "Unknown"),
                     "departure_airport": flight.get("source", "Unknown"),
                     "arrival_airport": flight.get("destination", "Unknown"),
-                    "total_distance_km": calculate_flight_distance(path_data) if path_data else 0
+                    "total_distance_km": calculate_flight_distance(path_data)
                 }
-            }
-            
-            database.logs.insert_one(log_entry)
-            
-            # Remove from active collections
-            database.tracking.delete_many({"flight_id": flight_id})
-            database.flights.delete_one({"flight_id": flight_id})
-            
-            completed_count += 1
-            print(f"✅ Auto-completed flight {flight_id} (Duration: {round(total_duration, 2)} minutes)")
-    
-    return jsonify({
-        "status": "success",
-        "message": f"Auto-completed {completed_count} landed flights",
-        "completed_count": completed_count
-    })
+            })
+            completed_ids.append(flight_id)
+            logger.info("✅ Auto-completed flight %s (Duration: %.2f minutes)", flight_id, total_duration)
+    
+    if completed_ids:
+        # Write all logs, then remove the flights from the active collections in bulk
+        database.logs.insert_many(log_entries)
+        # Only the logged points are removed; points flushed since they were read stay active
+        database.tracking.bulk_write([
+            DeleteMany({"flight_id": entry["flight_id"], "timestamp": {"$lte": entry["arrival_time"]}})
+            for entry in log_entries
+        ], ordered=False)
+        database.flights.delete_many({"flight_id": {"$in": completed_ids}})
+    
+    return len(completed_ids)
+
+def _haversine_total(lats, lons):
+    """Total haversine distance in kilometers along arrays of latitudes/longitudes (degrees)"""
+    lat_r = np.radians(lats)
+    lon_r = np.radians(lons)
+    dlat = np.diff(lat_r)
+    dlon = np.diff(lon_r)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat_r[:-1]) * np.cos(lat_r[1:]) * np.sin(dlon / 2) ** 2
+    return float(2 * 6371 * np.arcsin(np.sqrt(a)).sum())
+
+if njit is not None:
+    # Serial on purpose: numba worker threads would oversubscribe the CPUs across gunicorn workers
+    @njit(cache=True, fastmath=True)
+    def _haversine_total_nb(lats, lons):
+        """Fused single-pass haversine total (no temporary arrays) for long paths"""
+        to_rad = math.pi / 180
+        total = 0.0
+        for i in range(1, lats.shape[0]):
+            lat1 = lats[i - 1] * to_rad
+            lat2 = lats[i] * to_rad
+            dlat = lat2 - lat1
+            dlon = (lons[i] - lons[i - 1]) * to_rad
+            a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+            total += 2 * 6371 * math.asin(math.sqrt(a))
+        return total
+else:
+    _haversine_total_nb = None
 
 def calculate_flight_distance(path_data):
     """Calculate total distance flown by the flight"""
     if not path_data or len(path_data) < 2:
         return 0
     
-    total_distance = 0
-    for i in range(1, len(path_data)):
-        prev_point = path_data[i-1]
-        curr_point = path_data[i]
-        distance = calculate_distance(
-            prev_point["latitude"], prev_point["longitude"],
-            curr_point["latitude"], curr_point["longitude"]
-        )
-        total_distance += distance
-    
-    return round(total_distance, 2)
+    lats = np.fromiter((p["latitude"] for p in path_data), dtype=np.float64, count=len(path_data))
+    lons = np.fromiter((p["longitude"] for p in path_data), dtype=np.float64, count=len(path_data))
+    if _haversine_total_nb is not None and len(path_data) > NUMBA_MIN_POINTS:
+        return round(float(_haversine_total_nb(lats, lons)), 2)
+    return round(_haversine_total(lats, lons), 2)
 
 
 # --------------------------
 #  8️⃣ Get flight statistics
 # --------------------------
 @app.route('/api/flights/stats', methods=['GET'])
+@flushes_writes
 def get_flight_statistics():
     active_count = database.flights.count_documents({})
     completed_count = database.logs.count_documents({})
     total_tracking_points = database.tracking.count_documents({})
     
     # Get recent activity
-    recent_flights = list(database.flights.find().sort("last_updated", -1).limit(5))
-    recent_completed = list(database.logs.find().sort("completed_at", -1).limit(5))
-    
-    return jsonify({
+    recent_flights = list(database.flights.find(
+        {}, {**ACTIVE_FLIGHT_FIELDS, "_id": 0}
+    ).sort("last_updated", -1).limit(5))
+    recent_completed = list(database.logs.find(
+        {}, {"_id": 0, "path": 0, "flight_details": 0}
+    ).sort("completed_at", -1).limit(5))
+    
+    return ojson({
         "active_flights": active_count,
         "completed_flights": completed_count,
         "total_tracking_points": total_tracking_points,
@@ -442,16 +624,17 @@ def get_flight_statistics():
 #  9️⃣ Get flight route and destination info
 # --------------------------
 @app.route('/api/flight/<flight_id>/route', methods=['GET'])
+@flushes_writes
 def get_flight_route(flight_id):
     flight = database.flights.find_one({"flight_id": flight_id})
     if not flight:
-        return jsonify({"error": "Flight not found"}), 404
+        return ojson({"error": "Flight not found"}, 404)
     
     source = flight.get("source")
     destination = flight.get("destination")
     
     if not source or not destination:
-        return jsonify({"error": "Flight route information not available"}), 404
+        return ojson({"error": "Flight route information not available"}, 404)
     
     # Get route waypoints
     waypoints = get_route_waypoints(source, destination)
@@ -463,7 +646,7 @@ def get_flight_route(flight_id):
     source_info = AIRPORTS.get(source, {})
     dest_info = AIRPORTS.get(destination, {})
     
-    return jsonify({
+    return ojson({
         "flight_id": flight_id,
         "source": {
             "code": source,
@@ -495,50 +678,47 @@ def get_flight_route(flight_id):
 # --------------------------
 @app.route('/api/airports', methods=['GET'])
 def get_airports():
-    return jsonify(AIRPORTS)
+    response = Response(_AIRPORTS_JSON, mimetype='application/json')
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
 
 
 # --------------------------
 #  1️⃣1️⃣ Get flights by route
 # --------------------------
 @app.route('/api/flights/route/<source>/<destination>', methods=['GET'])
+@flushes_writes
 def get_flights_by_route(source, destination):
     flights = list(database.flights.find({
         "source": source,
         "destination": destination
-    }))
-    
-    for flight in flights:
-        flight["_id"] = str(flight["_id"])
-        flight["last_updated"] = flight["last_updated"].isoformat()
+    }, {"_id": 0}))
     
-    return jsonify(flights)
+    return ojson(flights)
 
 
 # --------------------------
 #  1️⃣2️⃣ Get flight path with destination tracking
 # --------------------------
 @app.route('/api/flight/<flight_id>/path', methods=['GET'])
+@flushes_writes
 def get_flight_path_with_destination(flight_id):
     # Get flight info
     flight = database.flights.find_one({"flight_id": flight_id})
     if not flight:
-        return jsonify({"error": "Flight not found"}), 404
+        return ojson({"error": "Flight not found"}, 404)
     
     # Get tracking history
-    tracking_points = list(database.tracking.find({"flight_id": flight_id}).sort("timestamp", 1))
+    tracking_points = list(database.tracking.find(
+        {"flight_id": flight_id}, {"_id": 0}
+    ).sort("timestamp", 1))
     
     # Get route waypoints
     source = flight.get("source")
     destination = flight.get("destination")
     waypoints = get_route_waypoints(source, destination) if source and destination else []
     
-    # Format tracking points
-    for point in tracking_points:
-        point["_id"] = str(point["_id"])
-        point["timestamp"] = point["timestamp"].isoformat()
-    
-    return jsonify({
+    return ojson({
         "flight_id": flight_id,
         "source": source,
         "destination": destination,
@@ -550,8 +730,14 @@ def get_flight_path_with_destination(flight_id):
 
 @app.route('/')
 def home():
-    return jsonify({"message": "FlightAware Backend Running"})
+    return ojson({"message": "FlightAware Backend Running"})
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    # The Flask dev server is for local development only; production runs under
+    # gunicorn with backend/gunicorn_conf.py
+    if os.environ.get('FLASK_ENV') == 'development':
+        app.run(debug=True)
+    else:
+        print("Set FLASK_ENV=development to use the dev server, or run: "
+              "gunicorn -c backend/gunicorn_conf.py backend.app:app")
@@ -2,3 +2,17 @@
 
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "flightaware"
+
+# MongoDB connection pool settings
+MONGO_MAX_POOL_SIZE = 100
+MONGO_MIN_POOL_SIZE = 10
+MONGO_MAX_IDLE_TIME_MS = 60000
+MONGO_COMPRESSORS = "zstd,zlib"
+
+# Tracking writes are buffered and flushed in bulk after this many seconds
+# or once this many records are pending, whichever comes first. The buffer is
+# per process, so gunicorn runs a single worker while buffering is on; set
+# WRITE_BUFFERING = False to write every update immediately and scale out workers
+WRITE_BUFFERING = True
+WRITE_FLUSH_INTERVAL_SECONDS = 0.1
+WRITE_FLUSH_MAX_RECORDS = 500
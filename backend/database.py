@@ -1,11 +1,181 @@
-from pymongo import MongoClient
+import atexit
+import bson
+import logging
+import threading
+from datetime import datetime, timezone
+from pymongo import MongoClient, UpdateOne, ASCENDING, DESCENDING, GEOSPHERE
+from pymongo.errors import AutoReconnect, BulkWriteError, PyMongoError
+from pymongo.write_concern import WriteConcern
 from backend import config
 
-# Initialize MongoDB connection
-client = MongoClient(config.MONGO_URI)
+# Initialize MongoDB connection (defaults to fast w=1, unjournaled writes for tracking data)
+client = MongoClient(
+    config.MONGO_URI,
+    maxPoolSize=config.MONGO_MAX_POOL_SIZE,
+    minPoolSize=config.MONGO_MIN_POOL_SIZE,
+    maxIdleTimeMS=config.MONGO_MAX_IDLE_TIME_MS,
+    compressors=config.MONGO_COMPRESSORS,
+    retryWrites=True,
+    w=1,
+    journal=False
+)
 db = client[config.DB_NAME]
 
 # Collections
 flights = db.flights
 tracking = db.flight_tracking
-logs = db.flight_logs
+# Completed flight logs are the only durable record once tracking data is deleted
+logs = db.get_collection("flight_logs", write_concern=WriteConcern(w="majority", j=True))
+jobs = db.completion_jobs
+
+# MongoDB error code for a duplicate _id
+DUPLICATE_KEY = 11000
+
+# Same logger as the API, so flush failures on the timer thread are reported too
+logger = logging.getLogger("flights")
+
+
+def ensure_indexes():
+    """Create indexes for the hot query predicates (no-op if they already exist)"""
+    try:
+        tracking.create_index([("flight_id", ASCENDING), ("timestamp", ASCENDING)])
+        flights.create_index([("flight_id", ASCENDING)], unique=True)
+        flights.create_index([("status", ASCENDING)])
+        flights.create_index([("route_progress", ASCENDING)])
+        logs.create_index([("completed_at", DESCENDING)])
+        jobs.create_index([("job_id", ASCENDING)], unique=True)
+        tracking.create_index([("geo", GEOSPHERE)])
+        flights.create_index([("geo", GEOSPHERE)])
+    except PyMongoError as e:
+        logger.warning("⚠️ Could not create MongoDB indexes: %s", e)
+
+
+ensure_indexes()
+
+
+# --------------------------
+#  Buffered tracking writes
+# --------------------------
+_buffer_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_tracking_buffer = []
+_flight_ops = {}  # flight_id -> merged $set fields (last write wins)
+_flush_timer = None
+
+
+def buffer_flight_update(tracking_doc, flight_update):
+    """Queue a tracking point and its flight $set for the next bulk flush"""
+    global _flush_timer
+    with _buffer_lock:
+        _tracking_buffer.append(tracking_doc)
+        _flight_ops.setdefault(flight_update["flight_id"], {}).update(flight_update)
+        flush_now = not config.WRITE_BUFFERING or len(_tracking_buffer) >= config.WRITE_FLUSH_MAX_RECORDS
+        if not flush_now and _flush_timer is None:
+            _flush_timer = threading.Timer(config.WRITE_FLUSH_INTERVAL_SECONDS, flush_pending_writes)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+    if flush_now:
+        flush_pending_writes()
+
+
+def flush_pending_writes():
+    """Write all buffered tracking points and flight updates to MongoDB"""
+    global _flush_timer
+    # Serialize flushes so updates for the same flight are applied in order
+    with _flush_lock:
+        with _buffer_lock:
+            if _flush_timer is not None:
+                _flush_timer.cancel()
+                _flush_timer = None
+            tracking_docs = _tracking_buffer[:]
+            flight_ops = dict(_flight_ops)
+            _tracking_buffer.clear()
+            _flight_ops.clear()
+
+        # One clock read per flush instead of one per record
+        received_at = datetime.now(timezone.utc)
+        for doc in tracking_docs:
+            doc["received_at"] = received_at
+        for fields in flight_ops.values():
+            fields["received_at"] = received_at
+
+        # Tracking points go first and separately, so a bad flight upsert never costs them
+        retry_docs = _insert_tracking(tracking_docs)
+        retry_ops = _upsert_flights(flight_ops)
+        if retry_docs or retry_ops:
+            _requeue(retry_docs, retry_ops)
+
+
+def _insert_tracking(docs):
+    """Bulk-insert tracking points; returns the points to retry after a transient error"""
+    if not docs:
+        return []
+    try:
+        tracking.insert_many(docs, ordered=False)
+    except AutoReconnect:
+        # Covers NetworkTimeout; the points were acknowledged with 202, so they are kept for the next flush
+        logger.warning("⚠️ Transient error flushing %d tracking points; retrying", len(docs), exc_info=True)
+        return docs
+    except BulkWriteError as e:
+        # Points stored by an earlier attempt come back as duplicate keys (insert_many keeps their _id)
+        if any(error["code"] != DUPLICATE_KEY for error in e.details["writeErrors"]):
+            logger.exception("❌ Failed to store some of %d tracking points", len(docs))
+    except PyMongoError:
+        logger.exception("❌ Failed to flush %d tracking points", len(docs))
+    except Exception:
+        # A point BSON cannot encode fails the whole batch; drop only that point
+        return _insert_tracking([doc for doc in docs if _encodable(doc)])
+    return []
+
+
+def _upsert_flights(flight_ops):
+    """Upsert the merged flight updates; returns the updates to retry after a transient error"""
+    if not flight_ops:
+        return {}
+    try:
+        flights.bulk_write([
+            UpdateOne({"flight_id": flight_id}, {"$set": fields}, upsert=True)
+            for flight_id, fields in flight_ops.items()
+        ], ordered=False)
+    except AutoReconnect:
+        logger.warning("⚠️ Transient error flushing %d flight updates; retrying", len(flight_ops), exc_info=True)
+        return flight_ops
+    except BulkWriteError as e:
+        # Two upserts racing on the unique flight_id index: the loser succeeds as a plain update on retry
+        ops = list(flight_ops.items())
+        errors = e.details["writeErrors"]
+        if any(error["code"] != DUPLICATE_KEY for error in errors):
+            logger.exception("❌ Failed to store some of %d flight updates", len(flight_ops))
+        return dict(ops[error["index"]] for error in errors if error["code"] == DUPLICATE_KEY)
+    except PyMongoError:
+        logger.exception("❌ Failed to flush %d flight updates", len(flight_ops))
+    except Exception:
+        return _upsert_flights({flight_id: fields for flight_id, fields in flight_ops.items() if _encodable(fields)})
+    return {}
+
+
+def _requeue(tracking_docs, flight_ops):
+    """Put unwritten records back at the front of the buffer and schedule another flush"""
+    global _flush_timer
+    with _buffer_lock:
+        _tracking_buffer[:0] = tracking_docs
+        for flight_id, fields in flight_ops.items():
+            # Updates buffered since this flush are newer, so they win
+            _flight_ops[flight_id] = {**fields, **_flight_ops.get(flight_id, {})}
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(config.WRITE_FLUSH_INTERVAL_SECONDS, flush_pending_writes)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+
+def _encodable(doc):
+    """Return whether doc can be BSON-encoded, logging it if not"""
+    try:
+        bson.encode(doc)
+        return True
+    except Exception:
+        logger.exception("❌ Dropped a record for flight %s that cannot be stored", doc.get("flight_id"))
+        return False
+
+
+atexit.register(flush_pending_writes)
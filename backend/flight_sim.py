@@ -0,0 +1,313 @@
+"""
+Flight Simulation Engine - Shared flight model and bulk uploader used by
+the live and realistic flight simulators
+"""
+
+import asyncio
+import atexit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import math
+import time
+import zlib
+import numpy as np
+import orjson
+from array import array
+from datetime import datetime
+import threading
+from queue import Queue, Empty
+from concurrent.futures import ThreadPoolExecutor
+from backend.airports import AIRPORT_LAT, AIRPORT_LON, IDX
+
+try:
+    from scipy.stats import qmc
+except ImportError:  # scipy is optional; route jitter falls back to plain uniform noise
+    qmc = None
+
+API_BASE_URL = "http://localhost:5000/api"
+BULK_URL = f"{API_BASE_URL}/flight/update_bulk"
+MAX_BATCH_SIZE = 256
+UPLOAD_INTERVAL = 1  # seconds
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Shared keep-alive session so the uploader reuses pooled connections
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=1, backoff_factor=0.1)
+))
+atexit.register(SESSION.close)
+
+# Updates from every flight are queued here and posted in batches
+_UPDATES = Queue()
+
+# Batch posts run here so a slow backend never stalls the uploader loop
+_POOL = ThreadPoolExecutor(max_workers=8)
+
+def _post_batch(batch):
+    """Post one batch of updates to the bulk endpoint"""
+    try:
+        response = SESSION.post(BULK_URL, data=orjson.dumps({"updates": batch}), headers=_JSON_HEADERS)
+        if response.status_code != 202:
+            print(f"❌ Failed to upload {len(batch)} updates: HTTP {response.status_code}: {response.text[:200]}")
+    except Exception as e:
+        print(f"❌ Error uploading {len(batch)} updates: {e}")
+
+def _drain_updates(background=True):
+    """Post every queued update to the bulk endpoint, MAX_BATCH_SIZE per request"""
+    while True:
+        batch = []
+        try:
+            while len(batch) < MAX_BATCH_SIZE:
+                batch.append(_UPDATES.get_nowait())
+        except Empty:
+            pass
+        if not batch:
+            return
+
+        # Stamp the whole batch with one clock read instead of one per flight per tick
+        timestamp = datetime.now().isoformat()
+        for update in batch:
+            update["timestamp"] = timestamp
+
+        if background:
+            try:
+                _POOL.submit(_post_batch, batch)
+                continue
+            except RuntimeError:  # the pool shuts down before atexit hooks run
+                pass
+        _post_batch(batch)
+
+# Set at exit so the uploader loop stops before the final drain
+_STOP = threading.Event()
+_UPLOADERS = []
+
+def _uploader():
+    """Background loop that flushes queued updates every UPLOAD_INTERVAL seconds"""
+    while not _STOP.wait(UPLOAD_INTERVAL):
+        _drain_updates()
+
+def start_uploader():
+    """Start the background uploader thread"""
+    thread = threading.Thread(target=_uploader, daemon=True)
+    thread.start()
+    _UPLOADERS.append(thread)
+    return thread
+
+def _shutdown_uploader():
+    """Stop and join the uploader threads, then post whatever is still queued"""
+    _STOP.set()
+    for thread in _UPLOADERS:
+        thread.join()
+    # The post pool has already shut down at interpreter exit, so the final drain posts inline
+    _drain_updates(background=False)
+
+atexit.register(_shutdown_uploader)
+
+# Flight phases, indexed by the phase ids stored in each flight's tick table
+PHASES = ("departed", "climbing", "cruising", "descending", "landed")
+
+# Fraction of the flight at which each phase after "departed" begins
+PHASE_BREAKS = (0.05, 0.15, 0.85, 0.95)
+
+def _to_unit_vector(lat, lon):
+    """Convert a latitude/longitude in degrees to an (x, y, z) point on the unit sphere"""
+    lat_r, lon_r = math.radians(lat), math.radians(lon)
+    return np.array([math.cos(lat_r) * math.cos(lon_r), math.cos(lat_r) * math.sin(lon_r), math.sin(lat_r)])
+
+class Flight:
+    """A simulated flight whose every update tick is precomputed at construction"""
+
+    # Slotted so large fleets don't pay for a per-flight __dict__
+    __slots__ = (
+        "flight_id", "source", "destination", "duration_seconds", "update_interval", "total_updates",
+        "is_running", "current_update", "start_time", "route_lat", "route_lon",
+        "_static", "_rng", "_steps", "_t0"
+    )
+
+    def __init__(self, flight_id, source, destination, duration_seconds, update_interval,
+                 route_jitter, cruise_altitude_jitter, climb, descent, static_fields=None):
+        self.flight_id = flight_id
+        self.source = source
+        self.destination = destination
+        self.duration_seconds = duration_seconds
+        self.update_interval = update_interval
+        self.total_updates = duration_seconds // update_interval
+        self.is_running = False
+        self.current_update = 0
+        self.start_time = None
+
+        # Fields that never change during the flight, merged into every update
+        self._static = {"flight_id": flight_id, **(static_fields or {"source": source, "destination": destination})}
+
+        # Per-flight generator seeded from the flight id, so each flight's noise is reproducible
+        self._rng = np.random.default_rng(zlib.crc32(flight_id.encode()))
+
+        # Calculate route (stored as parallel latitude/longitude arrays)
+        self.route_lat, self.route_lon = self.calculate_route(route_jitter)
+        self._steps = self.build_steps(cruise_altitude_jitter, climb, descent)
+
+    def calculate_route(self, jitter, num_waypoints=20):
+        """Calculate great-circle route waypoints as (latitudes, longitudes) arrays"""
+        s = IDX[self.source]
+        d = IDX[self.destination]
+        a = _to_unit_vector(AIRPORT_LAT[s], AIRPORT_LON[s])
+        b = _to_unit_vector(AIRPORT_LAT[d], AIRPORT_LON[d])
+        progress = np.linspace(0, 1, num_waypoints + 1)
+
+        # Spherical linear interpolation between the two airports
+        omega = math.acos(min(1.0, max(-1.0, float(a @ b))))
+        if omega < 1e-9:
+            points = np.outer(np.ones_like(progress), a)
+        else:
+            points = (np.outer(np.sin((1 - progress) * omega), a) + np.outer(np.sin(progress * omega), b)) / math.sin(omega)
+        lats = np.degrees(np.arcsin(np.clip(points[:, 2], -1.0, 1.0)))
+        # Longitudes are unwrapped so a route never sweeps the long way round the antimeridian
+        lons = np.degrees(np.unwrap(np.arctan2(points[:, 1], points[:, 0])))
+
+        # Add some realistic variation; a scrambled Sobol sequence spreads it more evenly than uniform draws
+        if qmc is not None:
+            m = math.ceil(math.log2(num_waypoints + 1))
+            unit = qmc.Sobol(d=2, scramble=True, seed=self._rng).random_base2(m)[:num_waypoints + 1]
+        else:
+            unit = self._rng.random((num_waypoints + 1, 2))
+        noise = (unit - 0.5) * (2 * jitter)
+
+        return lats + noise[:, 0], lons + noise[:, 1]
+
+    def build_steps(self, cruise_altitude_jitter, climb, descent):
+        """Precompute (lat, lon, altitude, speed, heading, phase_id) for every update tick"""
+        progress = np.arange(self.total_updates + 1) / self.total_updates
+        phase_id = np.searchsorted(PHASE_BREAKS, progress, side="right")
+
+        # Interpolate position along the waypoint route
+        waypoints = np.linspace(0, 1, len(self.route_lat))
+        lat = np.round(np.interp(progress, waypoints, self.route_lat), 6)
+        lon = np.round((np.interp(progress, waypoints, self.route_lon) + 180) % 360 - 180, 6)
+
+        # Noise is drawn once for the whole flight instead of every tick
+        cruise_altitude = 35000 + self._rng.integers(-cruise_altitude_jitter, cruise_altitude_jitter + 1, size=progress.size)
+        cruise_speed = 500 + self._rng.integers(-50, 51, size=progress.size)
+        departure_heading = self._rng.integers(0, 361, size=progress.size)
+        en_route_heading = self._rng.integers(250, 291, size=progress.size)  # Generally westbound
+
+        # climb/descent are ((altitude, speed) at phase start, (altitude, speed) at phase end)
+        (climb_start, climb_end), (descent_start, descent_end) = climb, descent
+        climb_span = (PHASE_BREAKS[0], PHASE_BREAKS[1])
+        descent_span = (PHASE_BREAKS[2], PHASE_BREAKS[3])
+        altitude = np.choose(phase_id, [
+            0,
+            np.interp(progress, climb_span, (climb_start[0], climb_end[0])),
+            cruise_altitude,
+            np.interp(progress, descent_span, (descent_start[0], descent_end[0])),
+            0
+        ])
+        speed = np.choose(phase_id, [
+            0,
+            np.interp(progress, climb_span, (climb_start[1], climb_end[1])),
+            cruise_speed,
+            np.interp(progress, descent_span, (descent_start[1], descent_end[1])),
+            0
+        ])
+        heading = np.choose(phase_id, [departure_heading, en_route_heading, en_route_heading, en_route_heading, 0])
+
+        # Packed columns: 8 bytes per coordinate and 4 (or 1) per integer field, per tick
+        return (
+            array("d", lat.tolist()),
+            array("d", lon.tolist()),
+            array("i", np.maximum(altitude, 0).astype(np.int32).tolist()),
+            array("i", np.maximum(speed, 0).astype(np.int32).tolist()),
+            array("i", heading.astype(np.int32).tolist()),
+            array("b", phase_id.tolist())
+        )
+
+    def step(self, i):
+        """Return the precomputed (lat, lon, altitude, speed, heading, phase_id) for tick i"""
+        lat, lon, altitude, speed, heading, phase_id = self._steps
+        return lat[i], lon[i], altitude[i], speed[i], heading[i], phase_id[i]
+
+    def get_flight_data(self, i):
+        """Build the update payload for tick i (the uploader stamps its timestamp)"""
+        lat, lon, altitude, speed, heading, phase_id = self.step(i)
+        return {
+            **self._static,
+            "latitude": lat,
+            "longitude": lon,
+            "altitude": altitude,
+            "speed": speed,
+            "heading": heading,
+            "status": PHASES[phase_id]
+        }
+
+    def send_flight_data(self, i):
+        """Queue the update for tick i for the next bulk upload"""
+        flight_data = self.get_flight_data(i)
+        _UPDATES.put(flight_data)
+        print(f"✈️ {self.flight_id}: {flight_data['status']} at {flight_data['latitude']:.4f}, {flight_data['longitude']:.4f} "
+              f"(alt: {flight_data['altitude']}ft, speed: {flight_data['speed']}kts, progress: {i / self.total_updates * 100:.1f}%)")
+        return True
+
+    async def run(self, delay=0):
+        """Run the complete flight simulation on the shared event loop"""
+        await asyncio.sleep(delay)
+        self.is_running = True
+        self.start_time = datetime.now()
+
+        print(f"🚀 Starting flight {self.flight_id}: {self.source} → {self.destination} "
+              f"(Duration: {self.duration_seconds / 60:.0f} min)")
+
+        update_interval = self.update_interval
+        self._t0 = time.monotonic()
+
+        for i in range(self.total_updates + 1):
+            if not self.is_running:
+                break
+
+            self.current_update = i
+            self.send_flight_data(i)
+            if i == self.total_updates:
+                break
+
+            # Wait until the next absolute deadline so send time doesn't accumulate drift
+            now = time.monotonic()
+            await asyncio.sleep(max(0.0, (self._t0 + (i + 1) * update_interval) - now))
+
+        # The last tick is already the "landed" update, so no extra send is needed
+        if self.is_running:
+            # Calculate actual flight duration
+            actual_duration = (datetime.now() - self.start_time).total_seconds() / 60
+            print(f"🏁 {self.flight_id} has landed at {self.destination}! (Actual duration: {actual_duration:.1f} min)")
+
+        self.is_running = False
+
+    def stop(self):
+        """Stop the flight simulation"""
+        self.is_running = False
+        print(f"⏹️ Stopped flight {self.flight_id}")
+
+async def run_flights(flights, delays, report_interval):
+    """Drive every flight as a task on one event loop, reporting progress every report_interval seconds"""
+    tasks = [asyncio.create_task(flight.run(delay)) for flight, delay in zip(flights, delays)]
+
+    # Count finished flights as they complete so the monitor never scans the fleet
+    remaining = len(tasks)
+    completed = asyncio.Event()
+
+    def _on_done(_task):
+        nonlocal remaining
+        remaining -= 1
+        if remaining == 0:
+            completed.set()
+
+    for task in tasks:
+        task.add_done_callback(_on_done)
+
+    while tasks:
+        try:
+            await asyncio.wait_for(completed.wait(), timeout=report_interval)
+            break
+        except asyncio.TimeoutError:
+            print(f"📊 {remaining} flights still scheduled or in progress...")
+    print("\n🏁 All flights completed!")
@@ -0,0 +1,21 @@
+# backend/gunicorn_conf.py
+# Production server settings. Run from the repository root:
+#   gunicorn -c backend/gunicorn_conf.py backend.app:app
+
+import multiprocessing
+from backend import config
+
+bind = "0.0.0.0:5000"
+
+# gevent workers yield during MongoDB I/O so many requests interleave per core
+worker_class = "gevent"
+# The tracking write buffer lives in each worker's memory: with several workers, a
+# flight completed by one could be re-upserted by another's later flush, so
+# buffering requires a single worker
+workers = 1 if config.WRITE_BUFFERING else 2 * multiprocessing.cpu_count() + 1
+worker_connections = 1000
+keepalive = 30
+
+# Each worker imports the app itself: MongoClient is not fork-safe, and the
+# write-buffer timer, log listener and job executor threads do not survive fork
+preload_app = False
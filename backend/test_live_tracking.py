@@ -3,17 +3,17 @@
 Test Live Flight Tracking - Simulate real-time flight updates
 """
 
-import requests
-import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import time
 import random
+import numpy as np
 from datetime import datetime, timedelta
+from backend._flight_test_lib import API_BASE_URL, BASE_URL, SESSION, active_fields, fail, post_json, log
 
-API_BASE_URL = "http://localhost:5000/api"
-
-def simulate_live_flight(flight_id, duration_minutes=5):
-    """Simulate a live flight with continuous updates"""
-    print(f"🚀 Starting live simulation for flight {flight_id}")
+async def simulate_live_flight(flight_id, duration_minutes=5, session=SESSION):
+    """Simulate a live flight with continuous updates on the running event loop"""
+    log.info(f"🚀 Starting live simulation for flight {flight_id}")
     
     # Starting position (New York)
     start_lat, start_lon = 40.7128, -74.0060
@@ -23,21 +23,33 @@ def simulate_live_flight(flight_id, duration_minutes=5):
     # Calculate total updates (every 10 seconds for duration)
     total_updates = (duration_minutes * 60) // 10
     
-    for i in range(total_updates):
-        # Interpolate between start and end positions
-        progress = i / (total_updates - 1)
-        lat = start_lat + (end_lat - start_lat) * progress
-        lon = start_lon + (end_lon - start_lon) * progress
-        
-        # Add some random variation for realism
-        lat += random.uniform(-0.1, 0.1)
-        lon += random.uniform(-0.1, 0.1)
-        
-        # Vary altitude and speed realistically
-        altitude = max(0, 35000 - (progress * 10000) + random.randint(-1000, 1000))
-        speed = max(0, 500 - (progress * 200) + random.randint(-50, 50))
-        heading = 270 + random.randint(-10, 10)  # Generally westbound
-        
+    # Updates are 10 seconds apart, so each timestamp is an offset from one clock read
+    base = datetime.now()
+    
+    # Interpolate between start and end positions, with random variation for realism
+    p = np.linspace(0, 1, total_updates)
+    lats = np.round(start_lat + (end_lat - start_lat) * p + np.random.uniform(-0.1, 0.1, total_updates), 6)
+    lons = np.round(start_lon + (end_lon - start_lon) * p + np.random.uniform(-0.1, 0.1, total_updates), 6)
+    
+    # Vary altitude and speed realistically
+    altitudes = np.clip(35000 - p * 10000 + np.random.randint(-1000, 1001, total_updates), 0, None).astype(int)
+    speeds = np.clip(500 - p * 200 + np.random.randint(-50, 51, total_updates), 0, None).astype(int)
+    headings = 270 + np.random.randint(-10, 11, total_updates)  # Generally westbound
+    
+    # Constant fields are set once; each update only overwrites the changing ones
+    flight_data = {
+        "flight_id": flight_id,
+        "aircraft_type": "Boeing 737",
+        "airline": "American Airlines",
+        "departure": "JFK",
+        "arrival": "LAX"
+    }
+    
+    # Updates are scheduled on fixed 10 second boundaries from here, so POST latency never accumulates
+    start = time.monotonic()
+    
+    points = zip(p.tolist(), lats.tolist(), lons.tolist(), altitudes.tolist(), speeds.tolist(), headings.tolist())
+    for i, (progress, lat, lon, altitude, speed, heading) in enumerate(points):
         # Determine status
         if progress < 0.1:
             status = "departed"
@@ -46,46 +58,48 @@ def simulate_live_flight(flight_id, duration_minutes=5):
         else:
             status = "en-route"
         
-        flight_data = {
-            "flight_id": flight_id,
-            "latitude": round(lat, 6),
-            "longitude": round(lon, 6),
-            "altitude": int(altitude),
-            "speed": int(speed),
-            "heading": int(heading),
-            "status": status,
-            "timestamp": datetime.now().isoformat(),
-            "aircraft_type": "Boeing 737",
-            "airline": "American Airlines",
-            "departure": "JFK",
-            "arrival": "LAX"
-        }
+        flight_data.update(
+            latitude=lat,
+            longitude=lon,
+            altitude=altitude,
+            speed=speed,
+            heading=heading,
+            status=status,
+            timestamp=(base + timedelta(seconds=10 * i)).isoformat()
+        )
         
         try:
-            response = requests.post(f"{API_BASE_URL}/flight/update", json=flight_data)
-            if response.status_code == 200:
-                print(f"✅ Update {i+1}/{total_updates}: {status} at {lat:.4f}, {lon:.4f} (alt: {altitude}ft, speed: {speed}kts)")
+            # The blocking POST runs in a worker thread so other flights keep ticking meanwhile
+            response = await asyncio.to_thread(post_json, f"{API_BASE_URL}/flight/update", flight_data, session)
+            if response.status_code == 202:
+                log.info(f"✅ Update {i+1}/{total_updates}: {status} at {lat:.4f}, {lon:.4f} (alt: {altitude}ft, speed: {speed}kts)")
             else:
-                print(f"❌ Failed to send update {i+1}: {response.json()}")
+                fail(response, f"Failed to send update {i+1}")
         except Exception as e:
-            print(f"❌ Error sending update {i+1}: {e}")
+            log.info(f"❌ Error sending update {i+1}: {e}")
         
-        # Wait 10 seconds before next update
-        time.sleep(10)
+        # Wait until the next 10 second boundary
+        delay = start + (i + 1) * 10 - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
     
-    print(f"🏁 Flight {flight_id} simulation completed!")
+    log.info(f"🏁 Flight {flight_id} simulation completed!")
 
-def create_test_flights():
+TEST_FLIGHTS = [
+    {"id": "LIVE001", "route": "NYC to Boston", "duration": 2},
+    {"id": "LIVE002", "route": "NYC to Chicago", "duration": 3},
+    {"id": "LIVE003", "route": "NYC to Miami", "duration": 4}
+]
+
+async def run_live_flights(test_flights=TEST_FLIGHTS, session=SESSION):
+    """Drive every test flight's live simulation concurrently on one event loop"""
+    await asyncio.gather(*[
+        simulate_live_flight(flight["id"], flight["duration"], session) for flight in test_flights
+    ])
+
+def create_test_flights(session=SESSION, test_flights=TEST_FLIGHTS):
     """Create multiple test flights for live tracking"""
-    test_flights = [
-        {"id": "LIVE001", "route": "NYC to Boston", "duration": 2},
-        {"id": "LIVE002", "route": "NYC to Chicago", "duration": 3},
-        {"id": "LIVE003", "route": "NYC to Miami", "duration": 4}
-    ]
-    
-    for flight in test_flights:
-        print(f"\n📡 Creating test flight {flight['id']} ({flight['route']})")
-        
+    def create_flight(flight):
         # Send initial flight data
         initial_data = {
             "flight_id": flight['id'],
@@ -103,51 +117,62 @@ def create_test_flights():
         }
         
         try:
-            response = requests.post(f"{API_BASE_URL}/flight/update", json=initial_data)
-            if response.status_code == 200:
-                print(f"✅ Created flight {flight['id']}")
+            response = post_json(f"{API_BASE_URL}/flight/update", initial_data, session)
+            if response.status_code == 202:
+                log.info(f"✅ Created flight {flight['id']}")
             else:
-                print(f"❌ Failed to create flight {flight['id']}: {response.json()}")
+                fail(response, f"Failed to create flight {flight['id']}")
         except Exception as e:
-            print(f"❌ Error creating flight {flight['id']}: {e}")
+            log.info(f"❌ Error creating flight {flight['id']}: {e}")
+    
+    for flight in test_flights:
+        log.info(f"\n📡 Creating test flight {flight['id']} ({flight['route']})")
+    
+    # The test flights are independent, so their initial updates are posted concurrently
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(create_flight, test_flights))
 
 def main():
-    print("🛩️ Live Flight Tracking Test")
-    print("=" * 50)
+    log.info("🛩️ Live Flight Tracking Test")
+    log.info("=" * 50)
     
     # Check if backend is running
     try:
-        response = requests.get("http://localhost:5000")
-        print("✅ Backend is running")
+        response = SESSION.get(BASE_URL)
+        log.info("✅ Backend is running")
     except:
-        print("❌ Backend not running. Please start with: python app.py")
+        log.info("❌ Backend not running. Please start with: python -m backend.app")
         return
     
     # Create test flights
-    print("\n📡 Creating test flights...")
+    log.info("\n📡 Creating test flights...")
     create_test_flights()
     
     # Show active flights
-    print("\n📊 Active flights:")
+    log.info("\n📊 Active flights:")
     try:
-        response = requests.get(f"{API_BASE_URL}/flights")
+        response = SESSION.get(f"{API_BASE_URL}/flights")
         if response.status_code == 200:
             flights = response.json()
-            for flight in flights:
-                print(f"  ✈️ {flight['flight_id']}: {flight['status']} at {flight['latitude']:.4f}, {flight['longitude']:.4f}")
+            for flight_id, status, lat, lon in map(active_fields, flights):
+                log.info(f"  ✈️ {flight_id}: {status} at {lat:.4f}, {lon:.4f}")
         else:
-            print("❌ Failed to get active flights")
+            log.info("❌ Failed to get active flights")
     except Exception as e:
-        print(f"❌ Error getting flights: {e}")
+        log.info(f"❌ Error getting flights: {e}")
+    
+    log.info("\n🎯 Now you can:")
+    log.info("1. Open frontend/index.html in your browser")
+    log.info("2. Click '🔴 Live' buttons to start live tracking")
+    log.info("3. Watch flights update in real-time on the map")
+    log.info("4. Use '🔴 Live All' to track all flights at once")
     
-    print("\n🎯 Now you can:")
-    print("1. Open frontend/index.html in your browser")
-    print("2. Click '🔴 Live' buttons to start live tracking")
-    print("3. Watch flights update in real-time on the map")
-    print("4. Use '🔴 Live All' to track all flights at once")
+    log.info("\n💡 The frontend will automatically update every 2 seconds")
+    log.info("   for any flights you're tracking live!")
     
-    print("\n💡 The frontend will automatically update every 2 seconds")
-    print("   for any flights you're tracking live!")
+    # Stream live updates for every test flight at once
+    log.info("\n🔴 Streaming live updates for the test flights...")
+    asyncio.run(run_live_flights())
 
 if __name__ == "__main__":
     main()
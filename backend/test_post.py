@@ -1,6 +1,6 @@
-import requests
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
+from backend._flight_test_lib import post_json
 
 url = "http://127.0.0.1:5000/api/flight/update"
 
@@ -14,16 +14,21 @@ path = [
     (24.8607, 67.0011)       # Karachi
 ]
 
+# one timestamp per point, one second apart, from a single clock read
+base = datetime.now()
+timestamps = [(base + timedelta(seconds=i)).isoformat() for i in range(len(path))]
+
+# fields that stay the same for every update
+data = {"flight_id": flight_id, "status": "en route"}
+
 for i, (lat, lon) in enumerate(path):
-    data = {
-        "flight_id": flight_id,
-        "latitude": lat,
-        "longitude": lon,
-        "altitude": 35000 - i * 2000,
-        "speed": 800 - i * 50,
-        "status": "en route",
-        "timestamp": datetime.now().isoformat()
-    }
-    res = requests.post(url, json=data)
+    data.update(
+        latitude=lat,
+        longitude=lon,
+        altitude=35000 - i * 2000,
+        speed=800 - i * 50,
+        timestamp=timestamps[i]
+    )
+    res = post_json(url, data)
     print(res.json())
     time.sleep(1)  # 1 second delay between updates
@@ -551,10 +551,13 @@ async function autoCompleteFlights() {
         const response = await fetch(`${API_BASE_URL}/flights/auto-complete`, {
             method: 'POST'
         });
-        const result = await response.json();
+        const job = await response.json();
         
         if (response.ok) {
-            if (result.completed_count > 0) {
+            const result = await waitForAutoCompleteJob(job.job_id);
+            if (result.status === 'failed') {
+                showAlert('error', result.error || 'Failed to auto-complete flights');
+            } else if (result.completed_count > 0) {
                 showAlert('success', `Auto-completed ${result.completed_count} flights`);
                 console.log(`✅ Auto-completed ${result.completed_count} flights`);
                 loadActiveFlights();
@@ -562,13 +565,25 @@ async function autoCompleteFlights() {
                 loadSystemStats();
             }
         } else {
-            showAlert('error', result.message || 'Failed to auto-complete flights');
+            showAlert('error', job.message || 'Failed to auto-complete flights');
         }
     } catch (error) {
         showAlert('error', 'Failed to auto-complete flights: ' + error.message);
     }
 }
 
+// Poll a background auto-complete job until it finishes
+async function waitForAutoCompleteJob(jobId) {
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const response = await fetch(`${API_BASE_URL}/flights/auto-complete/${jobId}`);
+        const job = await response.json();
+        if (!response.ok || job.status === 'completed' || job.status === 'failed') {
+            return job;
+        }
+    }
+}
+
 // Load system statistics
 async function loadSystemStats() {
     try {
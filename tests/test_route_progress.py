@@ -0,0 +1,29 @@
+import math
+
+from backend.airports import AIRPORTS, calculate_route_progress
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(a))
+
+
+def test_progress_across_antimeridian():
+    # NRT -> SFO crosses the antimeridian; a point over the mid-Pacific is well under way
+    assert 30 < calculate_route_progress(45.0, -175.0, "NRT", "SFO") < 70
+
+
+def test_trans_pacific_not_landed_early():
+    # 1,000 km short of SFO on an ~8,200 km route must not count as landed (>= 95%)
+    sfo = AIRPORTS["SFO"]
+    lat, lon = sfo["lat"], sfo["lon"] - 1000 / (111.2 * math.cos(math.radians(sfo["lat"])))
+    assert 1000 * 0.95 < haversine_km(lat, lon, sfo["lat"], sfo["lon"]) < 1000 * 1.05
+    assert calculate_route_progress(lat, lon, "NRT", "SFO") < 95
+
+
+def test_progress_endpoints():
+    nrt = AIRPORTS["NRT"]
+    lax = AIRPORTS["LAX"]
+    assert calculate_route_progress(nrt["lat"], nrt["lon"], "NRT", "LAX") == 0
+    assert calculate_route_progress(lax["lat"], lax["lon"], "NRT", "LAX") == 100